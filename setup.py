@@ -71,6 +71,9 @@ setup(name='zk_shell',
               'tabulate>=0.8.3',
               'twitter.common.net>=0.3.11',
               'xcmd>=0.0.3'
+          ],
+          'orjson': [
+              'orjson>=3.0.0'
           ]
       },
       include_package_data=True,
@@ -32,11 +32,13 @@ from .util import Netloc, to_bytes
 
 DEFAULT_ZK_PORT = 2181
 
+_with_port = re.compile(r".*:\d+$")
+
 
 def zk_client(host, scheme, credential):
     """ returns a connected (and possibly authenticated) ZK client """
 
-    if not re.match(r".*:\d+$", host):
+    if not _with_port.match(host):
         host = "%s:%d" % (host, DEFAULT_ZK_PORT)
 
     client = KazooClient(hosts=host)
@@ -300,10 +302,11 @@ class ZKProxy(Proxy):
 
     def read_path(self):
         try:
-            # TODO: propose a new ZK opcode (GetWithACLs) so we can do this in 1 rt
-            value = self.get_value(self.path)
-            acl, _ = self.client.get_acls(self.path)
-            return self.ZKPathValue(value, acl)
+            # TODO: propose a new ZK opcode (GetWithACLs) so we can do this in 1 request
+            # until then, send both requests at once so it's still 1 rt
+            value = self.client.get_async(self.path)
+            acl = self.client.get_acls_async(self.path)
+            return self.ZKPathValue(value.get()[0], acl.get()[0])
         except NoAuthError:
             raise AuthError("read", self.path)
 
@@ -313,9 +316,16 @@ class ZKProxy(Proxy):
         else:
             acl = [ACLReader.from_dict(a) for a in path_value.acl]
 
-        if self.client.exists(self.path):
+        # a failed get() tells us the znode is missing, no need for an exists() first.
+        # a denied get() is still reported as a failed read, as it always was
+        try:
+            value = self.get_value(self.path)
+            exists = True
+        except NoNodeError:
+            exists = False
+
+        if exists:
             try:
-                value = self.get_value(self.path)
                 if path_value.value != value:
                     self.client.set(self.path, path_value.value)
             except NoAuthError:
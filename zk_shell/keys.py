@@ -58,6 +58,11 @@ class Keys(object):
     # * foo-bar
     ALLOWED_KEY = '\w+(?:[\.-]\w+)*'
 
+    # compiled once, rather than formatted & looked up on every call
+    _KEY_VAR = re.compile(r'#{\s*(%s)\s*}' % ALLOWED_KEY)
+    _KEY_VARS = re.compile(r'#{\s*%s\s*}' % ALLOWED_KEY)
+    _ONE_KEY = re.compile(r'%s$' % ALLOWED_KEY)
+
     class Bad(Exception):
         pass
 
@@ -67,14 +72,12 @@ class Keys(object):
     @classmethod
     def extract(cls, keystr):
         """ for #{key} returns key """
-        regex = r'#{\s*(%s)\s*}' % cls.ALLOWED_KEY
-        return re.match(regex, keystr).group(1)
+        return cls._KEY_VAR.match(keystr).group(1)
 
     @classmethod
     def validate_one(cls, keystr):
         """ validates one key string """
-        regex = r'%s$' % cls.ALLOWED_KEY
-        if re.match(regex, keystr) is None:
+        if cls._ONE_KEY.match(keystr) is None:
             raise cls.Bad("Bad key syntax for: %s. Should be: key1.key2..." % (keystr))
 
         return True
@@ -84,8 +87,7 @@ class Keys(object):
         """
         extracts keys out of template in the form of: "a = #{key1}, b = #{key2.key3} ..."
         """
-        regex = r'#{\s*%s\s*}' % cls.ALLOWED_KEY
-        keys = re.findall(regex, template)
+        keys = cls._KEY_VARS.findall(template)
         if len(keys) == 0:
             raise cls.Bad("Bad keys template: %s. Should be: \"%s\"" % (
                 template, "a = #{key1}, b = #{key2.key3} ..."))
@@ -108,17 +110,28 @@ class Keys(object):
         """
         fetches the value corresponding to keys from obj
         """
+        return cls.fetch_parts(obj, keys.split("."))
+
+    @classmethod
+    def fetch_parts(cls, obj, keys_list):
+        """
+        like fetch(), but with keys already split
+        """
         current = obj
-        for key in keys.split("."):
-            if type(current) == list:
-                try:
-                    key = int(key)
-                except TypeError:
+        for key in keys_list:
+            try:
+                # the common case: current is a dict
+                current = current[key]
+                continue
+            except (IndexError, KeyError) as ex:
+                raise cls.Missing(key)
+            except TypeError:
+                if type(current) != list:
                     raise cls.Missing(key)
 
             try:
-                current = current[key]
-            except (IndexError, KeyError, TypeError) as ex:
+                current = current[int(key)]
+            except (IndexError, ValueError) as ex:
                 raise cls.Missing(key)
 
         return current
@@ -129,19 +142,38 @@ class Keys(object):
         gets the value corresponding to keys from obj. if keys is a template
         string, it extrapolates the keys in it
         """
+        return cls.value_compiled(obj, cls.compile(keystr))
+
+    @classmethod
+    def compile(cls, keystr):
+        """
+        parses keystr once, so it can be used with value_compiled() on many objs.
+        returns (template, keys): for template strings, keys is a list of
+        (placeholder, keys_list) pairs. for plain keys str, template is None and
+        keys is the keys_list
+        """
         if "#{" in keystr:
             # it's a template with keys vars
-            keys = cls.from_template(keystr)
-            for k in keys:
-                v = cls.fetch(obj, cls.extract(k))
-                keystr = keystr.replace(k, str(v))
+            keys = [(k, cls.extract(k).split(".")) for k in cls.from_template(keystr)]
+            return (keystr, keys)
 
-            value = keystr
-        else:
-            # plain keys str
-            value = cls.fetch(obj, keystr)
+        # plain keys str
+        return (None, keystr.split("."))
+
+    @classmethod
+    def value_compiled(cls, obj, compiled):
+        """
+        like value(), but takes the output of compile() instead of a keys str
+        """
+        template, keys = compiled
+        if template is None:
+            return cls.fetch_parts(obj, keys)
+
+        for placeholder, keys_list in keys:
+            v = cls.fetch_parts(obj, keys_list)
+            template = template.replace(placeholder, str(v))
 
-        return value
+        return template
 
     @classmethod
     def set(cls, obj, keys, value, fill_list_value=None):
@@ -16,13 +16,9 @@ Async recursive builder for map<child_path, content>
 
 """
 
+from collections import deque
 import os
 
-try:
-    from Queue import Queue
-except ImportError: # py3k
-    from queue import Queue
-
 from kazoo.exceptions import NoAuthError, NoNodeError
 
 
@@ -50,7 +46,7 @@ class PathMap(object):
         self.zk, self.path = zk, path
 
     def get(self):
-        reqs = Queue()
+        reqs = deque()
         child_pending = 1
         data_pending = 0
         path = self.path
@@ -64,17 +60,17 @@ class PathMap(object):
         if stat is None or stat.numChildren == 0:
             return
 
-        reqs.put(dispatch_child(path))
+        reqs.append(dispatch_child(path))
 
         while child_pending or data_pending:
-            req = reqs.get()
+            req = reqs.popleft()
 
             if type(req) == GetChildren:
                 try:
                     children = req.value
                     for child in children:
                         data_pending += 1
-                        reqs.put(dispatch_data(os.path.join(req.path, child)))
+                        reqs.append(dispatch_data(os.path.join(req.path, child)))
                 except (NoNodeError, NoAuthError): pass
 
                 child_pending -= 1
@@ -91,7 +87,7 @@ class PathMap(object):
                     # Does it have children? If so, get them
                     if stat.numChildren > 0:
                         child_pending += 1
-                        reqs.put(dispatch_child(req.path))
+                        reqs.append(dispatch_child(req.path))
                 except (NoNodeError, NoAuthError): pass
 
                 data_pending -= 1
@@ -12,6 +12,7 @@ from threading import Thread
 import bisect
 import copy
 import difflib
+import itertools
 import json
 import lz4.frame
 import os
@@ -26,6 +27,12 @@ import tempfile
 import time
 import zlib
 
+try:
+    import orjson
+except ImportError:
+    # optional, json is used instead
+    orjson = None
+
 from colors import green, red
 from kazoo.client import KazooClient
 from kazoo.exceptions import (
@@ -48,8 +55,6 @@ from kazoo.exceptions import (
 )
 from kazoo.protocol.states import KazooState
 from kazoo.security import OPEN_ACL_UNSAFE, READ_ACL_UNSAFE
-from tabulate import tabulate
-from twitter.common.net.tunnel import TunnelHelper
 from xcmd.complete import (
     complete,
     complete_boolean,
@@ -58,6 +63,7 @@ from xcmd.complete import (
 )
 from xcmd.conf import Conf, ConfVar
 from xcmd.xcmd import (
+    HAVE_READLINE,
     XCmd,
     FloatRequired,
     IntegerOptional,
@@ -85,26 +91,41 @@ from .util import (
     grouper,
     hosts_to_endpoints,
     invalid_hosts,
+    is_lz4,
+    is_zlib,
     Netloc,
+    pipelined,
+    precise_sleep,
     pretty_bytes,
+    reverse_lookup,
+    reverse_lookups,
     split,
     to_bool,
     to_int,
     which
 )
-from .xclient import XClient
+from .xclient import decoded_value, XClient
+
+
+_blank = re.compile(r"^\s*$")
+_url_scheme = re.compile(r"^\w+://")
+_shell_quoting = re.compile(r"[\"'\\]")
+_json_cache_size = 4096
+_children_cache_ttl = 2.0
+_children_cache_size = 256
+_resolved_paths_size = 1024
+_long_number = re.compile(r"\d{19,}")
 
 
 def connected(func):
     """ check connected, fails otherwise """
     @wraps(func)
-    def wrapper(*args, **kwargs):
-        self = args[0]
+    def wrapper(self, *args, **kwargs):
         if not self.connected:
             self.show_output("Not connected.")
         else:
             try:
-                return func(*args, **kwargs)
+                return func(self, *args, **kwargs)
             except APIError:
                 self.show_output("ZooKeeper internal error.")
             except AuthFailedError:
@@ -132,27 +153,34 @@ def connected(func):
 def check_path_exists_foreach(path_params, func):
     """ check that paths exist (unless we are in a transaction) """
     @wraps(func)
-    def wrapper(*args):
-        self = args[0]
-        params = args[1]
+    def wrapper(self, params):
 
         if not self.in_transaction:
+            checks = []
             for name in path_params:
                 value = getattr(params, name)
                 paths = value if type(value) == list else [value]
-                resolved = []
-                for path in paths:
-                    path = self.resolve_path(path)
-                    if not self.client.exists(path):
-                        self.show_output("Path %s doesn't exist", path)
-                        return False
-                    resolved.append(path)
+                resolved = [self.resolve_path(path) for path in paths]
 
                 if type(value) == list:
                     setattr(params, name, resolved)
                 else:
                     setattr(params, name, resolved[0])
 
+                checks.extend(resolved)
+
+            if len(checks) == 1:
+                # the common case, no need for the async machinery
+                missing = [path for path in checks if not self.client.exists(path)]
+            else:
+                # issue all the exists() requests at once, then reap them
+                pending = [(path, self.client.exists_async(path)) for path in checks]
+                missing = [path for path, result in pending if not result.get()]
+
+            if len(missing) > 0:
+                self.show_output("Path %s doesn't exist", missing[0])
+                return False
+
         return func(self, params)
 
     return wrapper
@@ -163,6 +191,22 @@ def check_paths_exists(*paths):
     return partial(check_path_exists_foreach, paths)
 
 
+def check_path_exists_lazily(func):
+    """
+    like check_paths_exists("path"), but for cmds that only do a single op on path:
+    instead of an exists() round trip beforehand, the op's NoNodeError is reported
+    """
+    @wraps(func)
+    def wrapper(self, params):
+        params.path = self.resolve_path(params.path)
+        try:
+            return func(self, params)
+        except NoNodeError:
+            self.show_output("Path %s doesn't exist", params.path)
+            return False
+    return wrapper
+
+
 def check_path_absent(func):
     """
     check path doesn't exist (unless we are in a txn or it's sequential)
@@ -174,9 +218,7 @@ def check_path_absent(func):
     for all other cases, it's dropped.
     """
     @wraps(func)
-    def wrapper(*args):
-        self = args[0]
-        params = args[1]
+    def wrapper(self, params):
         orig_path = params.path
         sequence = getattr(params, 'sequence', False)
         params.path = self.resolve_path(params.path)
@@ -188,16 +230,49 @@ def check_path_absent(func):
     return wrapper
 
 
+def decompressed(value):
+    """ returns value decompressed, if it's zlib or lz4 compressed """
+    # maybe it's compressed? check the header to avoid a failed decompress()
+    if is_zlib(value):
+        try:
+            value = zlib.decompress(value)
+        except zlib.error:
+            pass
+
+    # maybe it's lz4 compressed?
+    if is_lz4(value):
+        try:
+            value = lz4.frame.decompress(value)
+        except:
+            pass
+
+    return value
+
+
 class BadJSON(Exception):
     pass
 
 
+def json_loads(data):
+    """ json.loads(), but with orjson's faster parser when it's installed """
+    # orjson turns ints over 64 bits into floats, leave those to json
+    if orjson is not None and isinstance(data, str) and not _long_number.search(data):
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            # orjson is stricter (i.e.: NaN), let json decide
+            pass
+
+    return json.loads(data)
+
+
 def json_deserialize(data):
-    if data is None:
+    # parent znodes usually have no data, don't bother the parsers with them
+    if not data:
         raise BadJSON()
 
     try:
-        obj = json.loads(data)
+        obj = json_loads(data)
     except ValueError:
         raise BadJSON()
 
@@ -237,6 +312,11 @@ class Shell(XCmd):
             "chkzk_zxid_delta",
             "Difference in zxids to claim inconsistency between servers",
             200
+        ),
+        ConfVar(
+            "xcmd_history_size",
+            "Number of commands to keep in the history file",
+            5000
         )
     )
 
@@ -257,6 +337,10 @@ class Shell(XCmd):
         self._asynchronous = asynchronous
         self._zk = None
         self._txn = None        # holds the current transaction, if any
+        self._zk_url = None     # zk:// url for the connected server, see copy()
+        self._json_cache = {}   # parsed JSON by (path, mzxid), see _json_cached()
+        self._children_cache = {}   # path -> (ts, children) for completion, see _cached_children()
+        self._resolved_paths = {}   # (curdir, path) -> resolved path, see resolve_path()
         self.connected = False
         self.state_transitions_enabled = True
         self._tunnel = tunnel
@@ -266,32 +350,148 @@ class Shell(XCmd):
         if not self.connected:
             self.update_curdir("/")
 
+    def _setup_readline(self, path):
+        """ like XCmd's, but caps the history file to xcmd_history_size entries """
+        XCmd._setup_readline(self, path)
+        if HAVE_READLINE and path is not None:
+            import readline
+            # write_history_file() truncates to this, so the next load stays small
+            readline.set_history_length(self._conf.get_int("xcmd_history_size", 5000))
+
+    def resolve_path(self, path):
+        """ like XCmd's, but returns paths that are already absolute and normalized as is """
+        if path[:1] == "/" and "//" not in path and "/." not in path and (path == "/" or path[-1] != "/"):
+            return path
+
+        # relative paths get resolved over and over (i.e.: while completing), so cache them.
+        # '-' depends on olddir rather than curdir, so it's always resolved.
+        key = (self.curdir, path)
+        rpath = self._resolved_paths.get(key)
+        if rpath is None:
+            rpath = XCmd.resolve_path(self, path)
+            if path != "-":
+                if len(self._resolved_paths) >= _resolved_paths_size:
+                    self._resolved_paths.clear()
+                self._resolved_paths[key] = rpath
+        return rpath
+
     def _complete_path(self, cmd_param_text, full_cmd, *_):
         """ completes paths """
         if full_cmd.endswith(" "):
             cmd_param, path = " ", " "
         else:
-            pieces = shlex.split(full_cmd)
+            # shlex is only needed when there's quoting or escaping going on
+            if _shell_quoting.search(full_cmd) is None:
+                pieces = full_cmd.split()
+            else:
+                pieces = shlex.split(full_cmd)
             if len(pieces) > 1:
                 cmd_param = pieces[-1]
             else:
                 cmd_param = cmd_param_text
             path = cmd_param.rstrip("/") if cmd_param != "/" else "/"
 
-        if re.match(r"^\s*$", path):
-            return self._zk.get_children(self.curdir)
+        if _blank.match(path):
+            return self._cached_children(self.curdir)
 
         rpath = self.resolve_path(path)
-        if self._zk.exists(rpath):
-            opts = [os.path.join(path, znode) for znode in self._zk.get_children(rpath)]
-        else:
-            parent, child = os.path.dirname(rpath), os.path.basename(rpath)
-            relpath = os.path.dirname(path)
-            to_rel = lambda n: os.path.join(relpath, n) if relpath != "" else n
-            opts = [to_rel(n) for n in self._zk.get_children(parent) if n.startswith(child)]
+        try:
+            # a missing path shows up as NoNodeError, no need for an exists() first
+            names = self._cached_children(rpath)
+            base = os.path.join(path, "")
+        except NoNodeError:
+            parent, prefix = os.path.split(rpath)
+            base = os.path.join(os.path.dirname(path), "")
+            names = self._children_with_prefix(parent, prefix)
 
         offs = len(cmd_param) - len(cmd_param_text)
-        return [opt[offs:] for opt in opts]
+        if offs <= len(base):
+            # every option shares the same head, so slice it once
+            head = base[offs:]
+            return [head + name for name in names]
+        return [(base + name)[offs:] for name in names]
+
+    def _json_cached(self, path, value, stat):
+        """
+        like json_deserialize(), but reuses the parsed object while the znode's mzxid
+        is unchanged (i.e.: json_get inside a loop). callers must not modify it.
+        """
+        key = (path, stat.mzxid)
+        obj = self._json_cache.get(key)
+        if obj is None:
+            obj = json_deserialize(value)
+            self._json_cache_put(key, obj)
+        return obj
+
+    def _json_pretty(self, path, value, stat):
+        """
+        value's JSON, indented for display. the text is cached like _json_cached()'s
+        objects, so re-running json_cat skips both the parse and the dump.
+        """
+        key = (path, stat.mzxid, "pretty")
+        text = self._json_cache.get(key)
+        if text is None:
+            text = json.dumps(json_deserialize(value), indent=4)
+            self._json_cache_put(key, text)
+        return text
+
+    def _json_cache_put(self, key, value):
+        if len(self._json_cache) >= _json_cache_size:
+            self._json_cache.clear()
+        self._json_cache[key] = value
+
+    def _cached_children(self, path):
+        """
+        sorted get_children() for completion: hitting Tab repeatedly while typing a
+        line reuses the children fetched in the last couple of seconds. the cache is
+        dropped after every cmd, since it might have changed the tree. no child watch
+        is set: those would pile up server side, one per directory ever completed.
+        """
+        now = time.time()
+        entry = self._children_cache.get(path)
+        if entry is not None and now - entry[0] < _children_cache_ttl:
+            return entry[1]
+
+        children = sorted(self._zk.get_children(path))
+        if len(self._children_cache) >= _children_cache_size:
+            self._children_cache.clear()
+        self._children_cache[path] = (now, children)
+        return children
+
+    def _children_with_prefix(self, path, prefix):
+        """ the children of path starting with prefix, found by bisecting the sorted children """
+        children = self._cached_children(path)
+        start = bisect.bisect_left(children, prefix)
+        end = start
+        plen = len(prefix)
+        while end < len(children) and children[end][:plen] == prefix:
+            end += 1
+        return children[start:end]
+
+    def postcmd(self, stop, line):
+        self._children_cache.clear()
+        return stop
+
+    def _show_event(self, evt):
+        """ the watcher for ls, get & exists with watch=true """
+        self.show_output(str(evt))
+
+    def _bulk_output(self, lines, chunk_size=1 << 16):
+        """
+        like calling show_output() for each line, but with one write per chunk_size
+        chars. lines collected before an interruption (i.e.: ^C) are still shown.
+        """
+        buf, size = [], 0
+        try:
+            for line in lines:
+                buf.append(line)
+                size += len(line) + 1
+                if size >= chunk_size:
+                    self.show_output(u"\n".join(buf))
+                    buf, size = [], 0
+        finally:
+            if len(buf) > 0:
+                self.show_output(u"\n".join(buf))
 
     @property
     def client(self):
@@ -402,17 +602,16 @@ class Shell(XCmd):
         /zookeeper/quota: [ACL(perms=31, acl_list=['ALL'], id=Id(scheme=u'world', id=u'anyone'))]
 
         """
-        def replace(plist, oldv, newv):
-            try:
-                plist.remove(oldv)
-                plist.insert(0, newv)
-            except ValueError:
-                pass
+        sentinels = {READ_ACL_UNSAFE[0]: "WORLD_READ", OPEN_ACL_UNSAFE[0]: "WORLD_ALL"}
 
-        for path, acls in self._zk.get_acls_recursive(params.path, params.depth, params.ephemerals):
-            replace(acls, READ_ACL_UNSAFE[0], "WORLD_READ")
-            replace(acls, OPEN_ACL_UNSAFE[0], "WORLD_ALL")
-            self.show_output("%s: %s", path, acls)
+        def lines():
+            for path, acls in self._zk.get_acls_recursive(params.path, params.depth, params.ephemerals):
+                # swap the well-known ACLs for their names, in place
+                for i, acl in enumerate(acls):
+                    acls[i] = sentinels.get(acl, acl)
+                yield "%s: %s" % (path, acls)
+
+        self._bulk_output(lines())
 
     def complete_get_acls(self, cmd_param_text, full_cmd, *rest):
         complete_depth = partial(complete_values, [str(i) for i in range(-1, 11)])
@@ -452,9 +651,8 @@ class Shell(XCmd):
         configs,zookeeper
 
         """
-        watcher = lambda evt: self.show_output(str(evt))
-        kwargs = {"watch": watcher} if params.watch else {}
-        znodes = self._zk.get_children(params.path, **kwargs)
+        watcher = self._show_event if params.watch else None
+        znodes = self._zk.get_children(params.path, watch=watcher)
         self.show_output(params.sep.join(sorted(znodes)))
 
     def complete_ls(self, cmd_param_text, full_cmd, *rest):
@@ -641,14 +839,16 @@ class Shell(XCmd):
         # default to zk://connected_host, if connected
         src_connected_zk = dst_connected_zk = False
         if self.connected:
-            zk_url = self._zk.zk_url()
+            if self._zk_url is None:
+                self._zk_url = self._zk.zk_url()
+            zk_url = self._zk_url
 
             # if these are local paths, make them absolute paths
-            if not re.match(r"^\w+://", params.src):
+            if not _url_scheme.match(params.src):
                 params.src = "%s%s" % (zk_url, self.resolve_path(params.src))
                 src_connected_zk = True
 
-            if not re.match(r"^\w+://", params.dst):
+            if not _url_scheme.match(params.dst):
                 params.dst = "%s%s" % (zk_url, self.resolve_path(params.dst))
                 dst_connected_zk = True
 
@@ -718,9 +918,16 @@ class Shell(XCmd):
         ├── bar
 
         """
-        self.show_output(".")
-        for child, level in self._zk.tree(params.path, params.max_depth):
-            self.show_output(u"%s├── %s", u"│   " * level, child)
+        def lines():
+            # prefixes[level] is built once per level instead of once per znode
+            prefixes = [u"├── "]
+            yield u"."
+            for child, level in self._zk.tree(params.path, params.max_depth):
+                while level >= len(prefixes):
+                    prefixes.append(u"│   " + prefixes[-1])
+                yield prefixes[level] + child
+
+        self._bulk_output(lines())
 
     def complete_tree(self, cmd_param_text, full_cmd, *rest):
         complete_depth = partial(complete_values, [str(i) for i in range(0, 11)])
@@ -750,8 +957,8 @@ class Shell(XCmd):
         /bar: 3
 
         """
-        for child, level in self._zk.tree(params.path, params.depth, full_path=True):
-            self.show_output("%s: %d", child, self._zk.child_count(child))
+        for child, count in self._zk.child_counts(params.path, params.depth):
+            self.show_output("%s: %d", child, count)
 
     def complete_child_count(self, cmd_param_text, full_cmd, *rest):
         complete_depth = partial(complete_values, [str(i) for i in range(1, 11)])
@@ -804,8 +1011,7 @@ class Shell(XCmd):
         /copy/foo
 
         """
-        for path in self._zk.find(params.path, params.match, 0):
-            self.show_output(path)
+        self._bulk_output(self._zk.find(params.path, params.match, 0))
 
     complete_find = _complete_path
 
@@ -945,8 +1151,7 @@ class Shell(XCmd):
         /copy/Foo
 
         """
-        for path in self._zk.find(params.path, params.match, re.IGNORECASE):
-            self.show_output(path)
+        self._bulk_output(self._zk.find(params.path, params.match, re.IGNORECASE))
 
     def complete_ifind(self, cmd_param_text, full_cmd, *rest):
         complete_match = partial(complete_values, ["sometext"])
@@ -1007,13 +1212,16 @@ class Shell(XCmd):
     complete_igrep = complete_grep
 
     def grep(self, path, content, flags, show_matches):
-        for path, matches in self._zk.grep(path, content, flags):
-            if show_matches:
-                self.show_output("%s:", path)
-                for match in matches:
-                    self.show_output(match)
-            else:
-                self.show_output(path)
+        def lines():
+            for gpath, matches in self._zk.grep(path, content, flags):
+                if show_matches:
+                    yield gpath + ":"
+                    for match in matches:
+                        yield match
+                else:
+                    yield gpath
+
+        self._bulk_output(lines())
 
     @connected
     @ensure_params(Optional("path", "/"))
@@ -1050,7 +1258,7 @@ class Shell(XCmd):
 
     @connected
     @ensure_params(Required("path"), LabeledBooleanOptional("watch"))
-    @check_paths_exists("path")
+    @check_path_exists_lazily
     def do_get(self, params):
         """
 \x1b[1mNAME\x1b[0m
@@ -1075,25 +1283,9 @@ class Shell(XCmd):
         WatchedEvent(type='CHANGED', state='CONNECTED', path=u'/foo')
 
         """
-        watcher = lambda evt: self.show_output(str(evt))
-        kwargs = {"watch": watcher} if params.watch else {}
-        value, _ = self._zk.get(params.path, **kwargs)
-
-        # maybe it's compressed?
-        if value is not None:
-            try:
-                value = zlib.decompress(value)
-            except:
-                pass
-
-        # maybe it's lz4 compressed?
-        if value is not None:
-            try:
-                value = lz4.frame.decompress(value)
-            except:
-                pass
-
-        self.show_output(value)
+        watcher = self._show_event if params.watch else None
+        value, _ = self._zk.get(params.path, watch=watcher)
+        self.show_output(decompressed(value))
 
     def complete_get(self, cmd_param_text, full_cmd, *rest):
         completers = [self._complete_path, complete_labeled_boolean("watch")]
@@ -1137,26 +1329,39 @@ class Shell(XCmd):
         WatchedEvent(type='DELETED', state='CONNECTED', path=u'/foo')
 
         """
-        watcher = lambda evt: self.show_output(str(evt))
-        kwargs = {"watch": watcher} if params.watch else {}
+        watcher = self._show_event if params.watch else None
         pretty = params.pretty_date
         path = self.resolve_path(params.path)
-        stat = self._zk.exists(path, **kwargs)
+        stat = self._zk.exists(path, watch=watcher)
         if stat:
+            fmt_str = """Stat(
+  czxid=0x%x
+  mzxid=0x%x
+  ctime=%s
+  mtime=%s
+  version=%s
+  cversion=%s
+  aversion=%s
+  ephemeralOwner=0x%x
+  dataLength=%s
+  numChildren=%s
+  pzxid=0x%x
+)"""
             session = stat.ephemeralOwner if stat.ephemeralOwner else 0
-            self.show_output("Stat(")
-            self.show_output("  czxid=0x%x", stat.czxid)
-            self.show_output("  mzxid=0x%x", stat.mzxid)
-            self.show_output("  ctime=%s", time.ctime(stat.created) if pretty else stat.ctime)
-            self.show_output("  mtime=%s", time.ctime(stat.last_modified) if pretty else stat.mtime)
-            self.show_output("  version=%s", stat.version)
-            self.show_output("  cversion=%s", stat.cversion)
-            self.show_output("  aversion=%s", stat.aversion)
-            self.show_output("  ephemeralOwner=0x%x", session)
-            self.show_output("  dataLength=%s", stat.dataLength)
-            self.show_output("  numChildren=%s", stat.numChildren)
-            self.show_output("  pzxid=0x%x", stat.pzxid)
-            self.show_output(")")
+            self.show_output(
+                fmt_str,
+                stat.czxid,
+                stat.mzxid,
+                time.ctime(stat.created) if pretty else stat.ctime,
+                time.ctime(stat.last_modified) if pretty else stat.mtime,
+                stat.version,
+                stat.cversion,
+                stat.aversion,
+                session,
+                stat.dataLength,
+                stat.numChildren,
+                stat.pzxid
+            )
         else:
             self.show_output("Path %s doesn't exist", params.path)
 
@@ -1253,7 +1458,7 @@ class Shell(XCmd):
 
     @connected
     @ensure_params(Required("path"), Required("value"), IntegerOptional("version", -1))
-    @check_paths_exists("path")
+    @check_path_exists_lazily
     def do_set(self, params):
         """
 \x1b[1mNAME\x1b[0m
@@ -1752,14 +1957,12 @@ child_watches=%s"""
 
         if params.verbose:
             if params.reverse_lookup:
-                def reverse_endpoint(endpoint):
-                    ip = endpoint.rsplit(":", 1)[0]
-                    try:
-                        return socket.gethostbyaddr(ip)[0]
-                    except socket.herror:
-                        pass
-                    return ip
-                endpoints = [reverse_endpoint(endp) for endp in endpoints]
+                ips = [endp.rsplit(":", 1)[0] for endp in endpoints]
+                reverse_lookups(ips)
+                endpoints = [reverse_lookup(ip) or ip for ip in ips]
+
+            # only chkzk needs it and it's slow to import, so load it here
+            from tabulate import tabulate
 
             headers = [""] + endpoints
             table = tabulate(values, headers=headers, tablefmt="grid", stralign="right")
@@ -1796,7 +1999,7 @@ child_watches=%s"""
 
         """
         for path in params.paths:
-            self._zk.delete(path, recursive=True)
+            self._zk.delete_recursive(path)
 
     complete_rmr = complete_rm
 
@@ -1917,27 +2120,26 @@ child_watches=%s"""
         /configs/b: no.
 
         """
-        def check_valid(path, print_path):
+        def check_valid(path, value, print_path):
             result = "no"
-            value, _ = self._zk.get(path)
-
             if value is not None:
                 try:
-                    x = json.loads(value)
+                    x = json_loads(value)
                     result = "yes"
                 except ValueError:
                     pass
 
             if print_path:
-                self.show_output("%s: %s.", os.path.basename(path), result)
-            else:
-                self.show_output("%s.", result)
+                return "%s: %s." % (os.path.basename(path), result)
+            return "%s." % (result)
 
         if not params.recursive:
-            check_valid(params.path, False)
+            value, _ = self._zk.get(params.path)
+            self.show_output(check_valid(params.path, value, False))
         else:
-            for cpath, _ in self._zk.tree(params.path, 0, full_path=True):
-                check_valid(cpath, True)
+            paths = (cpath for cpath, _ in self._zk.tree(params.path, 0, full_path=True))
+            self._bulk_output(
+                check_valid(cpath, value, True) for cpath, value, _ in self._zk.get_many(paths))
 
     def complete_json_valid(self, cmd_param_text, full_cmd, *rest):
         completers = [self._complete_path, complete_labeled_boolean("recursive")]
@@ -1981,25 +2183,23 @@ child_watches=%s"""
         ]
 
         """
-        def json_output(path, print_path):
-            value, _ = self._zk.get(path)
-
-            if value is not None:
-                try:
-                    value = json.dumps(json.loads(value), indent=4)
-                except ValueError:
-                    pass
+        def json_output(path, value, stat, print_path):
+            try:
+                value = self._json_pretty(path, value, stat)
+            except BadJSON:
+                pass
 
             if print_path:
-                self.show_output("%s:\n%s", os.path.basename(path), value)
-            else:
-                self.show_output(value)
+                return "%s:\n%s" % (os.path.basename(path), value)
+            return value
 
         if not params.recursive:
-            json_output(params.path, False)
+            value, stat = self._zk.get(params.path)
+            self.show_output(json_output(params.path, value, stat, False))
         else:
-            for cpath, _ in self._zk.tree(params.path, 0, full_path=True):
-                json_output(cpath, True)
+            paths = (cpath for cpath, _ in self._zk.tree(params.path, 0, full_path=True))
+            self._bulk_output(
+                json_output(cpath, value, stat, True) for cpath, value, stat in self._zk.get_many(paths))
 
     def complete_json_cat(self, cmd_param_text, full_cmd, *rest):
         completers = [self._complete_path, complete_labeled_boolean("recursive")]
@@ -2040,25 +2240,29 @@ child_watches=%s"""
             return
 
         if params.recursive:
-            paths = self._zk.tree(params.path, 0, full_path=True)
+            paths = (cpath for cpath, _ in self._zk.tree(params.path, 0, full_path=True))
             print_path = True
         else:
-            paths = [(params.path, 0)]
+            paths = [params.path]
             print_path = False
 
-        for cpath, _ in paths:
-            try:
-                jstr, _ = self._zk.get(cpath)
-                value = Keys.value(json_deserialize(jstr), params.keys)
+        keys = Keys.compile(params.keys)
 
-                if print_path:
-                    self.show_output("%s: %s", os.path.basename(cpath), value)
-                else:
-                    self.show_output(value)
-            except BadJSON as ex:
-                self.show_output("Path %s has bad JSON.", cpath)
-            except Keys.Missing as ex:
-                self.show_output("Path %s is missing key %s.", cpath, ex)
+        def lines():
+            for cpath, jstr, stat in self._zk.get_many(paths):
+                try:
+                    value = Keys.value_compiled(self._json_cached(cpath, jstr, stat), keys)
+
+                    if print_path:
+                        yield "%s: %s" % (os.path.basename(cpath), value)
+                    else:
+                        yield "%s" % (value,)
+                except BadJSON as ex:
+                    yield "Path %s has bad JSON." % (cpath)
+                except Keys.Missing as ex:
+                    yield "Path %s is missing key %s." % (cpath, ex)
+
+        self._bulk_output(lines())
 
     def complete_json_get(self, cmd_param_text, full_cmd, *rest):
         """ TODO: prefetch & parse znodes & suggest keys """
@@ -2451,10 +2655,11 @@ child_watches=%s"""
 
         path_map = PathMap(self._zk, params.path)
 
+        keys = Keys.compile(params.keys)
         values = defaultdict(int)
         for path, data in path_map.get():
             try:
-                value = Keys.value(json_deserialize(data), params.keys)
+                value = Keys.value_compiled(json_deserialize(data), keys)
                 values[value] += 1
             except BadJSON as ex:
                 if params.report_errors:
@@ -2563,6 +2768,7 @@ child_watches=%s"""
 
         path_map = PathMap(self._zk, params.path)
 
+        keys = Keys.compile(params.keys)
         dupes_by_path = defaultdict(lambda: defaultdict(list))
         for path, data in path_map.get():
             parent, child = split(path)
@@ -2571,7 +2777,7 @@ child_watches=%s"""
                 continue
 
             try:
-                value = Keys.value(json_deserialize(data), params.keys)
+                value = Keys.value_compiled(json_deserialize(data), keys)
                 dupes_by_path[parent][value].append(path)
             except BadJSON as ex:
                 if params.report_errors:
@@ -2707,21 +2913,96 @@ child_watches=%s"""
             self.show_output("<pause> must be >= 0.")
             return
 
-        cmds = params.cmds
+        # parse the commands once, not on every iteration
+        cmds = [self._resolve_cmd(cmd) for cmd in params.cmds]
+
+        # plain gets are pipelined: across all iterations when there's no pause
+        # in between, otherwise within each one
+        paths = self._plain_get_paths(params.cmds)
+        if paths is not None:
+            gets = list(zip(paths, cmds))
+            if pause == 0:
+                iterations = itertools.repeat(None, repeat) if repeat > 0 else itertools.repeat(None)
+                with self.transitions_disabled():
+                    self._pipelined_gets(get for _ in iterations for get in gets)
+                return
+            cmds = [partial(self._pipelined_gets, gets)]
+
         i = 0
         with self.transitions_disabled():
             while True:
                 for cmd in cmds:
                     try:
-                        self.onecmd(cmd)
+                        cmd()
                     except Exception as ex:
                         self.show_output("Command failed: %s.", ex)
                 if pause > 0.0:
-                    time.sleep(pause)
+                    precise_sleep(pause)
                 i += 1
                 if repeat > 0 and i >= repeat:
                     break
 
+    def _plain_get_paths(self, lines):
+        """ if every line is a plain 'get <path>', returns their resolved paths """
+        if not self.connected:
+            return None
+
+        paths = []
+        for line in lines:
+            cmd, arg, _ = self.parseline(line)
+            if cmd != "get":
+                return None
+            try:
+                args = shlex.split(arg)
+            except ValueError:
+                return None
+            if len(args) != 1:
+                return None
+            paths.append(self.resolve_path(args[0]))
+
+        return paths
+
+    def _pipelined_gets(self, requests):
+        """
+        for loop: runs (path, cmd) plain get requests with the reads pipelined instead
+        of waiting for each one. on errors, the original cmd is run to report it
+        """
+        def dispatch(request):
+            # a get that can't even be sent (i.e.: the connection is gone) is
+            # handled like a failed result, so the rest of the gets still run
+            try:
+                return self._zk.get_async(request[0])
+            except Exception:
+                return None
+
+        for (_, cmd), result in pipelined(requests, dispatch):
+            if result is not None:
+                try:
+                    value, _ = result.get()
+                except Exception:
+                    result = None
+
+            if result is None:
+                try:
+                    cmd()
+                except Exception as ex:
+                    self.show_output("Command failed: %s.", ex)
+                continue
+
+            self.show_output(decompressed(decoded_value(value)))
+
+    def _resolve_cmd(self, line):
+        """
+        returns a function that runs line, as onecmd() would. the line is parsed
+        and its do_ method looked up once, anything unusual is left to onecmd()
+        """
+        cmd, arg, parsed = self.parseline(line)
+        if parsed and cmd:
+            func = getattr(self, "do_" + cmd, None)
+            if func is not None:
+                return partial(func, arg)
+        return partial(self.onecmd, line)
+
     def complete_loop(self, cmd_param_text, full_cmd, *rest):
         complete_repeat = partial(complete_values, [str(i) for i in range(0, 11)])
         complete_pause = partial(complete_values, [str(i) for i in range(0, 11)])
@@ -2781,17 +3062,20 @@ child_watches=%s"""
         def check(path, show_path, resolved):
             info = info_by_path.get(path, None)
             if info is None:
-                self.show_output("No session info for %s.", path)
-            else:
-                self.show_output("%s%s",
-                               "%s: " % (path) if show_path else "",
-                               info.resolved if resolved else str(info))
+                return "No session info for %s." % (path)
+            return "%s%s" % ("%s: " % (path) if show_path else "",
+                             info.resolved if resolved else str(info))
 
         if not params.recursive:
-            check(params.path, False, params.reverse)
+            self.show_output(check(params.path, False, params.reverse))
         else:
-            for cpath, _ in self._zk.tree(params.path, 0, full_path=True):
+            if params.reverse:
+                # resolve all the ips in one go, rather than one at a time as they show up
+                reverse_lookups(ip for info in info_by_path.values() for ip in (info.ip, info.server_ip))
+
+            self._bulk_output(
                 check(cpath, True, params.reverse)
+                for cpath, _ in self._zk.tree(params.path, 0, full_path=True))
 
     def complete_ephemeral_endpoint(self, cmd_param_text, full_cmd, *rest):
         """ TODO: the hosts lists can be retrieved from self.zk.hosts """
@@ -3044,6 +3328,7 @@ child_watches=%s"""
 
         """
         self._zk.reconnect()
+        self._zk_url = None
         self.update_curdir("/")
 
     @connected
@@ -3053,7 +3338,7 @@ child_watches=%s"""
         pwd - Prints the current path
 
         """
-        self.show_output("%s", self.curdir)
+        self.show_output(self.curdir)
 
     def do_EOF(self, *args):
         """
@@ -3094,6 +3379,9 @@ child_watches=%s"""
             self._zk.close()
             self._zk = None
         self.connected = False
+        self._zk_url = None
+        self._json_cache.clear()
+        self._children_cache.clear()
 
     def _init_zk_client(self, hosts_list):
         """
@@ -3118,6 +3406,7 @@ child_watches=%s"""
             nl = Netloc.from_string(auth_host)
             rhost, rport = hosts_to_endpoints(nl.host)[0]
             if self._tunnel is not None:
+                from twitter.common.net.tunnel import TunnelHelper
                 lhost, lport = TunnelHelper.create_tunnel(rhost, rport, self._tunnel)
                 hosts.append('{0}:{1}'.format(lhost, lport))
             else:
@@ -3152,6 +3441,9 @@ child_watches=%s"""
 
         self._zk = XClient(zk_client)
 
+        # the connected server might change whenever the session's state does
+        self._zk.add_listener(self._reset_zk_url)
+
         hosts = ['{0}:{1}'.format(*host_port) for host_port in zk_client.hosts]
 
         if self._asynchronous:
@@ -3159,6 +3451,9 @@ child_watches=%s"""
         else:
             self._connect_sync(hosts)
 
+    def _reset_zk_url(self, _state):
+        self._zk_url = None
+
     def _connect_async(self, hosts):
         def listener(state):
             self.connected = state == KazooState.CONNECTED
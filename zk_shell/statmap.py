@@ -16,74 +16,61 @@ Async recursive builder for map<child_path, Stat>
 
 """
 
+from collections import deque
 import os
 
-try:
-    from Queue import Queue
-except ImportError: # py3k
-    from queue import Queue
-
 from kazoo.exceptions import NoAuthError, NoNodeError
 
 
-class Request(object):
-    __slots__ = ('path', 'result')
-
-    def __init__(self, path, result):
-        self.path, self.result = path, result
-
-    @property
-    def value(self):
-        return self.result.get()
-
-
-class Exists(Request): pass
-
-
-class GetChildren(Request): pass
-
-
 class StatMap(object):
     __slots__ = ("zk", "path", "recursive")
 
     def __init__(self, zk, path, recursive=False):
         self.zk, self.path, self.recursive = zk, path, recursive
 
-    def get(self):
-        reqs = Queue()
-        pending = 0
+    def get(self, max_inflight=256):
+        """
+        at most max_inflight requests are sent at once, the rest wait in a
+        backlog (in the same order they'd have been sent)
+        """
+        reqs = deque()
+        backlog = deque()
+        inflight = 0
         path = self.path
         zk = self.zk
         recursive = self.recursive
-        exists_of = lambda path: zk.exists_async(path)
-        dispatch_exists = lambda path: reqs.put(Exists(path, exists_of(path)))
-        child_of = lambda path: zk.get_children_async(path)
-        dispatch_child = lambda path: reqs.put(GetChildren(path, child_of(path)))
+        # requests are (path, IAsyncResult, is_exists) tuples
+        exists_of = lambda path: (path, zk.exists_async(path), True)
+        child_of = lambda path: (path, zk.get_children_async(path), False)
 
         try:
             children = zk.get_children(path)
         except NoNodeError:
             return
 
-        for child in children:
-            dispatch_exists(os.path.join(path, child))
+        # ZK paths are always /-separated, so join each parent once & concat its children
+        prefix = os.path.join(path, "")
+        backlog.extend((exists_of, prefix + child) for child in children)
 
-        pending = len(children)
+        while backlog or inflight:
+            while backlog and inflight < max_inflight:
+                make_req, rpath = backlog.popleft()
+                reqs.append(make_req(rpath))
+                inflight += 1
 
-        while pending:
-            req = reqs.get()
+            rpath, result, is_exists = reqs.popleft()
+            inflight -= 1
 
             try:
-                if type(req) == Exists:
-                    yield (req.path, req.value)
-
-                    if recursive and req.value.children_count > 0:
-                        pending += 1
-                        dispatch_child(req.path)
+                if is_exists:
+                    stat = result.get()
+                    # the znode might be gone by now
+                    if stat is not None:
+                        yield (rpath, stat)
+
+                        if recursive and stat.children_count > 0:
+                            backlog.append((child_of, rpath))
                 else:
-                    for child in req.value:
-                        pending += 1
-                        dispatch_exists(os.path.join(req.path, child))
+                    prefix = os.path.join(rpath, "")
+                    backlog.extend((exists_of, prefix + child) for child in result.get())
             except (NoNodeError, NoAuthError): pass
-
-            pending -= 1
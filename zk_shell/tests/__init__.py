@@ -1 +1,10 @@
 # tests
+
+import os
+
+
+# when run in parallel (i.e.: pytest -n auto), give each worker its own
+# ZK cluster so their tests_path don't collide
+_worker = os.getenv("PYTEST_XDIST_WORKER", "")
+if _worker.startswith("gw") and _worker[2:].isdigit():
+    os.environ.setdefault("ZOOKEEPER_PORT_OFFSET", str(20000 + 100 * int(_worker[2:])))
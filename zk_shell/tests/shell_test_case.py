@@ -39,34 +39,77 @@ class XStringIO(StringIO):
 class ShellTestCase(unittest.TestCase):
     """ base class for all tests """
 
+    # set by tearDown() when the last test left tests_path untouched
+    _clean = False
+
     @classmethod
     def setUpClass(cls):
         get_global_cluster().start()
 
+        cls.tests_path = os.getenv("ZKSHELL_PREFIX_DIR", "/tests")
+        cls.zk_hosts = ",".join(server.address for server in get_global_cluster())
+        cls.username = os.getenv("ZKSHELL_USER", "user")
+        cls.password = os.getenv("ZKSHELL_PASSWD", "user")
+        cls.digested_password = os.getenv("ZKSHELL_DIGESTED_PASSWD", "F46PeTVYeItL6aAyygIVQ9OaaeY=")
+        cls.super_password = os.getenv("ZKSHELL_SUPER_PASSWD", "test")
+        cls.scheme = os.getenv("ZKSHELL_AUTH_SCHEME", "digest")
+
+        # one session for the whole class, setUp() only resets the prefix dir
+        cls.client = KazooClient(cls.zk_hosts, 5)
+        cls.client.start()
+        cls.client.add_auth(cls.scheme, "%s:%s" % (cls.username, cls.password))
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.client is not None:
+            cls.wipe(cls.tests_path)
+            cls.client.stop()
+            cls.client.close()
+            cls.client = None
+
+    @classmethod
+    def wipe(cls, path, batch_size=1000):
+        """
+        like client.delete(path, recursive=True), but the znodes are deleted
+        (children first) in transactions of up to batch_size ops
+        """
+        if not cls.client.exists(path):
+            return
+
+        paths, stack = [], [path]
+        while stack:
+            cpath = stack.pop()
+            paths.append(cpath)
+            stack.extend(os.path.join(cpath, child) for child in cls.client.get_children(cpath))
+
+        paths.reverse()
+        for start in range(0, len(paths), batch_size):
+            txn = cls.client.transaction()
+            for dpath in paths[start:start + batch_size]:
+                txn.delete(dpath)
+            if any(isinstance(result, Exception) for result in txn.commit()):
+                # something changed underneath, fall back to the slow path
+                cls.client.delete(path, recursive=True)
+                return
+
     def setUp(self):
         """
         make sure that the prefix dir is empty
         """
-        self.tests_path = os.getenv("ZKSHELL_PREFIX_DIR", "/tests")
-        self.zk_hosts = ",".join(server.address for server in get_global_cluster())
-        self.username = os.getenv("ZKSHELL_USER", "user")
-        self.password = os.getenv("ZKSHELL_PASSWD", "user")
-        self.digested_password = os.getenv("ZKSHELL_DIGESTED_PASSWD", "F46PeTVYeItL6aAyygIVQ9OaaeY=")
-        self.super_password = os.getenv("ZKSHELL_SUPER_PASSWD", "test")
-        self.scheme = os.getenv("ZKSHELL_AUTH_SCHEME", "digest")
-
-        self.client = KazooClient(self.zk_hosts, 5)
-        self.client.start()
-        self.client.add_auth(self.scheme, self.auth_id)
-        if self.client.exists(self.tests_path):
-            self.client.delete(self.tests_path, recursive=True)
-        self.client.create(self.tests_path, str.encode(""))
+        if not self._clean:
+            self.wipe(self.tests_path)
+            self.client.create(self.tests_path, b"")
 
         self.output = XStringIO()
         self.shell = Shell([self.zk_hosts], 5, self.output, setup_readline=False, asynchronous=False)
+        self._temp_dir = None
 
-        # Create an empty test dir (needed for some tests)
-        self.temp_dir = tempfile.mkdtemp()
+    @property
+    def temp_dir(self):
+        """ an empty dir, only created for the tests that need it """
+        if self._temp_dir is None:
+            self._temp_dir = tempfile.mkdtemp()
+        return self._temp_dir
 
     @property
     def auth_id(self):
@@ -85,21 +128,34 @@ class ShellTestCase(unittest.TestCase):
             self.shell._disconnect()
             self.shell = None
 
-        if os.path.isdir(self.temp_dir):
-            shutil.rmtree(self.temp_dir)
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
 
-        if self.client is not None:
-            if self.client.exists(self.tests_path):
-                self.client.delete(self.tests_path, recursive=True)
-
-            self.client.stop()
-            self.client.close()
-            self.client = None
+        # a tests_path that never had children, data or ACL changes can be reused
+        # as is. a non-zero cversion means children came and went (sequential
+        # suffixes come from it), so that needs a fresh one too
+        stat = self.client.exists(self.tests_path)
+        type(self)._clean = stat is not None and stat.numChildren == 0 and \
+            stat.cversion == 0 and stat.version == 0 and stat.aversion == 0
 
     ###
     # Helpers.
     ##
 
+    def create_many(self, paths_values):
+        """
+        creates each (path, value) in a single transaction, so parents have to
+        come before their children. meant for setting up a test's znodes.
+        """
+        txn = self.client.transaction()
+        for path, value in paths_values:
+            txn.create(path, str.encode(value))
+
+        for result in txn.commit():
+            if isinstance(result, Exception):
+                raise result
+
     def create_compressed(self, path, value):
         """
         ZK Shell doesn't support creating directly from a bytes array so we use a Kazoo client
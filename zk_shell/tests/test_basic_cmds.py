@@ -7,6 +7,7 @@ import time
 
 from .shell_test_case import PYTHON3, ShellTestCase
 
+from kazoo.exceptions import ConnectionClosedError, RolledBackError
 from kazoo.testing.harness import get_global_cluster
 
 # pylint: disable=R0904
@@ -164,6 +165,13 @@ class BasicCmdsTestCase(ShellTestCase):
         self.shell.onecmd("igrep %s hello show_matches=true" % (self.tests_path))
         self.assertEqual("%s:\nHELLO\n" % (path), self.output.getvalue())
 
+    def test_get_missing(self):
+        """ get on a missing znode reports it and fails the cmd """
+        rv = self.shell.onecmd("get %s/missing" % (self.tests_path))
+        self.assertIs(False, rv)
+        self.assertEqual("Path %s/missing doesn't exist\n" % (
+            self.tests_path), self.output.getvalue())
+
     def test_get_compressed(self):
         """ test getting compressed content out of znode """
         self.create_compressed("%s/one" % (self.tests_path), "some value")
@@ -180,38 +188,44 @@ class BasicCmdsTestCase(ShellTestCase):
 
     def test_child_count(self):
         """ test child count for a given path """
-        self.shell.onecmd("create %s/something ''" % (self.tests_path))
-        self.shell.onecmd("create %s/something/else ''" % (self.tests_path))
-        self.shell.onecmd("create %s/something/else/entirely ''" % (self.tests_path))
-        self.shell.onecmd("create %s/something/else/entirely/child ''" % (self.tests_path))
+        self.create_many([
+            ("%s/something" % (self.tests_path), ""),
+            ("%s/something/else" % (self.tests_path), ""),
+            ("%s/something/else/entirely" % (self.tests_path), ""),
+            ("%s/something/else/entirely/child" % (self.tests_path), ""),
+        ])
         self.shell.onecmd("child_count %s/something" % (self.tests_path))
         expected_output = u"%s/something/else: 2\n" % (self.tests_path)
         self.assertEqual(expected_output, self.output.getvalue())
 
     def test_diff_equal(self):
-        self.shell.onecmd("create %s/a ''" % (self.tests_path))
-        self.shell.onecmd("create %s/a/something 'aaa'" % (self.tests_path))
-        self.shell.onecmd("create %s/a/something/else 'bbb'" % (self.tests_path))
-        self.shell.onecmd("create %s/a/something/else/entirely 'ccc'" % (self.tests_path))
-
-        self.shell.onecmd("create %s/b ''" % (self.tests_path))
-        self.shell.onecmd("create %s/b/something 'aaa'" % (self.tests_path))
-        self.shell.onecmd("create %s/b/something/else 'bbb'" % (self.tests_path))
-        self.shell.onecmd("create %s/b/something/else/entirely 'ccc'" % (self.tests_path))
+        self.create_many([
+            ("%s/a" % (self.tests_path), ""),
+            ("%s/a/something" % (self.tests_path), "aaa"),
+            ("%s/a/something/else" % (self.tests_path), "bbb"),
+            ("%s/a/something/else/entirely" % (self.tests_path), "ccc"),
+
+            ("%s/b" % (self.tests_path), ""),
+            ("%s/b/something" % (self.tests_path), "aaa"),
+            ("%s/b/something/else" % (self.tests_path), "bbb"),
+            ("%s/b/something/else/entirely" % (self.tests_path), "ccc"),
+        ])
 
         self.shell.onecmd("diff %s/a %s/b" % (self.tests_path, self.tests_path))
         expected_output = u"Branches are equal.\n"
         self.assertEqual(expected_output, self.output.getvalue())
 
     def test_diff_different(self):
-        self.shell.onecmd("create %s/a ''" % (self.tests_path))
-        self.shell.onecmd("create %s/a/something 'AAA'" % (self.tests_path))
-        self.shell.onecmd("create %s/a/something/else 'bbb'" % (self.tests_path))
+        self.create_many([
+            ("%s/a" % (self.tests_path), ""),
+            ("%s/a/something" % (self.tests_path), "AAA"),
+            ("%s/a/something/else" % (self.tests_path), "bbb"),
 
-        self.shell.onecmd("create %s/b ''" % (self.tests_path))
-        self.shell.onecmd("create %s/b/something 'aaa'" % (self.tests_path))
-        self.shell.onecmd("create %s/b/something/else 'bbb'" % (self.tests_path))
-        self.shell.onecmd("create %s/b/something/else/entirely 'ccc'" % (self.tests_path))
+            ("%s/b" % (self.tests_path), ""),
+            ("%s/b/something" % (self.tests_path), "aaa"),
+            ("%s/b/something/else" % (self.tests_path), "bbb"),
+            ("%s/b/something/else/entirely" % (self.tests_path), "ccc"),
+        ])
 
         self.shell.onecmd("diff %s/a %s/b" % (self.tests_path, self.tests_path))
         expected_output = u"-+ something\n++ something/else/entirely\n"
@@ -238,6 +252,25 @@ class BasicCmdsTestCase(ShellTestCase):
         expected_output = u"hello\nhello\nhello\n" * 2
         self.assertEqual(expected_output, self.output.getvalue())
 
+    def test_loop_failed_send(self):
+        """ a get that can't be sent is retried by its cmd, the rest keep going """
+        self.shell.onecmd("create %s/a 'hello'" % (self.tests_path))
+        self.shell.onecmd("create %s/b 'bye'" % (self.tests_path))
+        zk = self.shell._zk
+        get_async = zk.get_async
+
+        def flaky_get_async(path, *args, **kwargs):
+            if path.endswith("/a"):
+                raise ConnectionClosedError("Connection has been closed")
+            return get_async(path, *args, **kwargs)
+
+        zk.get_async = flaky_get_async
+        cmd = "get %s/a" % (self.tests_path)
+        other = "get %s/b" % (self.tests_path)
+        self.shell.onecmd("loop 2 0 '%s' '%s'" % (cmd, other))
+        expected_output = u"hello\nbye\n" * 2
+        self.assertEqual(expected_output, self.output.getvalue())
+
     def test_bad_arguments(self):
         self.shell.onecmd("rm /")
         expected_output = u"Bad arguments.\n"
@@ -329,6 +362,67 @@ class BasicCmdsTestCase(ShellTestCase):
         self.shell.onecmd("exists %s/a" % self.tests_path)
         self.assertIn("numChildren=0", self.output.getvalue())
 
+    def test_rmr_many_batches(self):
+        """ a subtree bigger than a transaction batch is deleted across several """
+        base = "%s/big" % (self.tests_path)
+        self.create_many([(base, "")] + [("%s/%d" % (base, i), "") for i in range(100)])
+
+        zk = self.shell._zk
+        transaction = zk.transaction
+        txns = []
+
+        def counting_transaction():
+            txns.append(None)
+            return transaction()
+
+        zk.transaction = counting_transaction
+        self.shell.onecmd("rmr %s" % (base))
+        self.shell.onecmd("exists %s" % (base))
+        self.assertEqual("Path %s doesn't exist\n" % (base), self.output.getvalue())
+        self.assertEqual(2, len(txns))
+
+    def test_rmr_failed_transaction(self):
+        """ a batch whose transaction fails is deleted one znode at a time instead """
+        base = "%s/big" % (self.tests_path)
+        self.create_many([(base, "")] + [("%s/%d" % (base, i), "") for i in range(100)])
+
+        zk = self.shell._zk
+        transaction = zk.transaction
+
+        def failing_transaction():
+            txn = transaction()
+            txn.commit = lambda: [RolledBackError()]
+            return txn
+
+        zk.transaction = failing_transaction
+        self.shell.onecmd("rmr %s" % (base))
+        self.shell.onecmd("exists %s" % (base))
+        self.assertEqual("Path %s doesn't exist\n" % (base), self.output.getvalue())
+
+    def test_child_count_recursive(self):
+        """ recursive counts match counting each child on its own """
+        base = "%s/counts" % (self.tests_path)
+        self.create_many([
+            (base, ""),
+            ("%s/a" % (base), ""),
+            ("%s/a/x" % (base), ""),
+            ("%s/a/x/1" % (base), ""),
+            ("%s/a/x/2" % (base), ""),
+            ("%s/a/y" % (base), ""),
+            ("%s/b" % (base), ""),
+            ("%s/b/z" % (base), ""),
+            ("%s/c" % (base), ""),
+        ])
+
+        for depth in (0, 1, 2):
+            zk = self.shell._zk
+            expected_output = "".join(
+                "%s: %d\n" % (child, zk.child_count(child))
+                for child, _ in zk.tree(base, depth, full_path=True))
+            self.shell.onecmd("child_count %s %d" % (base, depth))
+            self.assertEqual(expected_output, self.output.getvalue())
+            self.output.reset()
+
     def test_conf_get_all(self):
         self.shell.onecmd("conf get")
         self.assertIn("chkzk_stat_retries", self.output.getvalue())
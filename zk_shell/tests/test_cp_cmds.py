@@ -94,6 +94,17 @@ class CpCmdsTestCase(ShellTestCase):
         self.shell.onecmd("cp %s %s recursive=true overwrite=true" % (src, dst))
         self.assertIn("doesn't exist\n", self.output.getutf8())
 
+    def test_cp_unreadable_dst(self):
+        """ overwriting a znode we can't read reports the denied read """
+        src = "%s/src" % (self.tests_path)
+        dst = "%s/dst" % (self.tests_path)
+        self.shell.onecmd("create %s 'hello'" % (src))
+        self.shell.onecmd("create %s 'bye'" % (dst))
+        self.shell.onecmd("set_acls %s 'world:anyone:w'" % (dst))
+        self.shell.onecmd("cp %s %s recursive=false overwrite=true" % (src, dst))
+        self.assertIn("Permission denied: Could not read znode %s.\n" % (dst),
+                      self.output.getutf8())
+
     def test_bad_auth(self):
         server = next(iter(get_global_cluster()))
         self.shell.onecmd("cp / zk://foo:bar@%s/y" % server.address)
@@ -33,6 +33,15 @@ class JsonCmdsTestCase(ShellTestCase):
         expected_output = "valid: yes.\ninvalid: no.\n"
         self.assertEqual(expected_output, self.output.getvalue())
 
+    def test_json_valid_recursive_nested(self):
+        """ nested znodes are shown by their name, like direct children """
+        self.shell.onecmd(
+            "create %s/a/b/c '{\"x\": 1}' ephemeral=false sequence=false recursive=true" % (
+                self.tests_path))
+        self.shell.onecmd("json_valid %s recursive=true" % (self.tests_path))
+        expected_output = "a: no.\nb: no.\nc: yes.\n"
+        self.assertEqual(expected_output, self.output.getvalue())
+
     def test_json_cat(self):
         """ test cat """
         jsonstr = '{"a": ["foo", "bar"], "b": ["foo", 3]}'
@@ -91,6 +100,16 @@ class JsonCmdsTestCase(ShellTestCase):
         self.assertIn("a: value", self.output.getvalue())
         self.assertIn("b: value", self.output.getvalue())
 
+    def test_json_get_recursive_nested(self):
+        """ test get recursively, through nested znodes """
+        jsonstr = '{"a": {"b": {"c": {"d": "value"}}}}'
+        self.shell.onecmd(
+            "create %s/x/y '%s' ephemeral=false sequence=false recursive=true" % (
+                self.tests_path, jsonstr))
+        self.shell.onecmd("json_get %s a.b.c.d recursive=true" % (self.tests_path))
+        expected_output = "Path %s/x has bad JSON.\ny: value\n" % (self.tests_path)
+        self.assertEqual(expected_output, self.output.getvalue())
+
     def test_json_get_template(self):
         """ test get """
         jsonstr = '{"a": {"b": {"c": {"d": "value"}}}}'
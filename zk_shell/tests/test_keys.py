@@ -32,10 +32,25 @@ class KeysTestCase(unittest.TestCase):
         obj = {'foo': {'bar': 'v1'}}
         self.assertEqual('v1', Keys.fetch(obj, 'foo.bar'))
 
+    def test_fetch_list(self):
+        obj = {'foo': [{'bar': 'v1'}, 'v2']}
+        self.assertEqual('v1', Keys.fetch(obj, 'foo.0.bar'))
+        self.assertEqual('v2', Keys.fetch(obj, 'foo.-1'))
+        self.assertRaises(Keys.Missing, Keys.fetch, obj, 'foo.2')
+        self.assertRaises(Keys.Missing, Keys.fetch, obj, 'foo.bar')
+        self.assertRaises(Keys.Missing, Keys.fetch, obj, 'foo.1.0')
+
     def test_value(self):
         obj = {'foo': {'bar': 'v1'}}
         self.assertEqual('version=v1', Keys.value(obj, 'version=#{foo.bar}'))
 
+    def test_value_compiled(self):
+        obj = {'foo': {'bar': 'v1'}, 'baz': [1, 2]}
+        self.assertEqual('v1', Keys.value_compiled(obj, Keys.compile('foo.bar')))
+        compiled = Keys.compile('#{foo.bar}-#{baz.1}')
+        self.assertEqual('v1-2', Keys.value_compiled(obj, compiled))
+        self.assertEqual('v2-3', Keys.value_compiled({'foo': {'bar': 'v2'}, 'baz': [0, 3]}, compiled))
+
     def test_set(self):
         obj = {'foo': {'bar': 'v1'}}
         Keys.set(obj, 'foo.bar', 'v2')
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+""" usage test cases """
+
+from collections import namedtuple
+import unittest
+
+from kazoo.exceptions import NoAuthError, NoNodeError
+
+from zk_shell.usage import Usage
+
+
+Stat = namedtuple("Stat", "dataLength numChildren")
+
+
+class FakeResult(object):
+    """ an already resolved IAsyncResult """
+
+    def __init__(self, value=None, exception=None):
+        self.value, self.exception = value, exception
+
+    def get(self):
+        if self.exception is not None:
+            raise self.exception
+        return self.value
+
+
+class FakeClient(object):
+    """ just enough of a client for Usage: path -> (children, size) """
+
+    def __init__(self, nodes, failures=None):
+        self.nodes = nodes
+        self.failures = failures or {}
+
+    def exists(self, path):
+        return Stat(self.nodes[path][1], len(self.nodes[path][0])) if path in self.nodes else None
+
+    def get_children_async(self, path, include_data=False):
+        if path in self.failures:
+            return FakeResult(exception=self.failures[path])
+
+        children, size = self.nodes[path]
+        return FakeResult((children, Stat(size, len(children))))
+
+
+class UsageTestCase(unittest.TestCase):
+    """ test Usage """
+
+    def setUp(self):
+        """ /a holds 1 + 2 + 4 + 8 + 16 bytes """
+        self.nodes = {
+            "/a": (["b", "c", "d"], 1),
+            "/a/b": (["e"], 2),
+            "/a/b/e": ([], 4),
+            "/a/c": ([], 8),
+            "/a/d": ([], 16),
+        }
+
+    def test_total(self):
+        self.assertEqual(31, Usage(FakeClient(self.nodes), "/a").value)
+
+    def test_missing(self):
+        self.assertEqual(0, Usage(FakeClient(self.nodes), "/nope").value)
+
+    def test_vanished_child(self):
+        client = FakeClient(self.nodes, {"/a/c": NoNodeError()})
+        self.assertEqual(23, Usage(client, "/a").value)
+
+    def test_unreadable_child(self):
+        client = FakeClient(self.nodes, {"/a/b": NoAuthError()})
+        self.assertEqual(25, Usage(client, "/a").value)
+
+    def test_unreadable_last_child(self):
+        client = FakeClient(self.nodes, {"/a/b/e": NoAuthError()})
+        self.assertEqual(27, Usage(client, "/a").value)
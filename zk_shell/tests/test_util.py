@@ -2,11 +2,23 @@
 
 """ util test cases """
 
+import re
+import time
 import unittest
+import zlib
+
+import lz4.frame
 
 from zk_shell.util import (
     find_outliers,
     invalid_hosts,
+    is_lz4,
+    is_zlib,
+    line_matcher,
+    Netloc,
+    pipelined,
+    precise_sleep,
+    text_matcher,
     valid_hosts
 )
 
@@ -37,3 +49,60 @@ class UtilTestCase(unittest.TestCase):
     def test_find_outliers(self):
         self.assertEqual([0, 6], find_outliers([100, 6, 7, 8, 9, 10, 150], 5))
         self.assertEqual([], find_outliers([5, 6, 5, 4, 5], 3))
+
+    def test_pipelined(self):
+        inflight = []
+
+        def dispatch(item):
+            inflight.append(item)
+            return item * 2
+
+        results = []
+        for item, result in pipelined(range(10), dispatch, window=3):
+            # never more than window requests ahead of the consumer
+            self.assertTrue(len(inflight) - len(results) <= 3)
+            results.append((item, result))
+
+        self.assertEqual([(i, i * 2) for i in range(10)], results)
+
+    def test_is_zlib(self):
+        for level in range(0, 10):
+            self.assertTrue(is_zlib(zlib.compress(b"some value", level)))
+        self.assertFalse(is_zlib(b"some value"))
+        self.assertFalse(is_zlib(b"x"))
+        self.assertFalse(is_zlib(None))
+        self.assertFalse(is_zlib(u"some value"))
+
+    def test_is_lz4(self):
+        self.assertTrue(is_lz4(lz4.frame.compress(b"some value")))
+        self.assertFalse(is_lz4(zlib.compress(b"some value")))
+        self.assertFalse(is_lz4(b"some value"))
+        self.assertFalse(is_lz4(None))
+
+    def test_line_matcher(self):
+        value = u"foo: bar\nFOO: baz\nqux"
+        self.assertEqual([u"foo: bar"], line_matcher("foo", 0)(value))
+        self.assertEqual([u"foo: bar", u"FOO: baz"], line_matcher("foo", re.IGNORECASE)(value))
+        self.assertEqual([u"FOO: baz", u"qux"], line_matcher("^(FOO|qux)", 0)(value))
+        self.assertEqual([], line_matcher("nope", re.IGNORECASE)(value))
+
+    def test_text_matcher(self):
+        self.assertTrue(text_matcher("b/c", 0)("/a/b/c"))
+        self.assertFalse(text_matcher("B/c", 0)("/a/b/c"))
+        self.assertTrue(text_matcher("B/c", re.IGNORECASE)("/a/b/c"))
+        self.assertTrue(text_matcher("^/a/.$", 0)("/a/b"))
+        self.assertFalse(text_matcher("^/a/.$", 0)("/a/bc"))
+        self.assertTrue(text_matcher("x|c", 0)("/a/b/c"))
+        self.assertFalse(text_matcher("x|C", 0)("/a/b/c"))
+        self.assertTrue(text_matcher("x|C", re.IGNORECASE)("/a/b/c"))
+
+    def test_netloc_from_string(self):
+        self.assertEqual(Netloc("h:2181", "", ""), Netloc.from_string("h:2181"))
+        self.assertEqual(Netloc("h:2181", "digest", "u:p"), Netloc.from_string("digest:u:p@h:2181"))
+        self.assertRaises(ValueError, Netloc.from_string, "digest@h:2181")
+
+    def test_precise_sleep(self):
+        for secs in (0.0005, 0.005):
+            start = time.time()
+            precise_sleep(secs)
+            self.assertTrue(time.time() - start >= secs)
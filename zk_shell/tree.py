@@ -16,13 +16,9 @@ Async tree builder
 
 """
 
+from collections import deque
 import os
 
-try:
-    from Queue import Queue
-except ImportError: # py3k
-    from queue import Queue
-
 from kazoo.exceptions import NoAuthError, NoNodeError
 
 
@@ -47,7 +43,7 @@ class Tree(object):
         """
         Paths matching exclude_recurse will not be recursed.
         """
-        reqs = Queue()
+        reqs = deque()
         pending = 1
         path = self.path
         zk = self.zk
@@ -62,10 +58,10 @@ class Tree(object):
         if stat is None or stat.numChildren == 0:
             return
 
-        reqs.put(dispatch(path))
+        reqs.append(dispatch(path))
 
         while pending:
-            req = reqs.get()
+            req = reqs.popleft()
 
             try:
                 children = req.value
@@ -73,7 +69,7 @@ class Tree(object):
                     cpath = os.path.join(req.path, child)
                     if exclude_recurse is None or exclude_recurse not in child:
                         pending += 1
-                        reqs.put(dispatch(cpath))
+                        reqs.append(dispatch(cpath))
                     yield cpath
             except (NoNodeError, NoAuthError): pass
 
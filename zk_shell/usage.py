@@ -12,13 +12,9 @@ Fast path size calculations
 
 """
 
+from collections import deque
 import os
 
-try:
-    from Queue import Queue
-except ImportError: # py3k
-    from queue import Queue
-
 from kazoo.exceptions import NoAuthError, NoNodeError
 
 
@@ -39,9 +35,6 @@ class Total(object):
     def __init__(self, value=0):
         self.value = value
 
-    def add(self, count):
-        self.value += count
-
 
 class Usage(object):
     __slots__ = ("zk", "path")
@@ -59,8 +52,7 @@ class Usage(object):
             return total.value
 
     def get(self, ptotal=None):
-        reqs = Queue()
-        pending = 1
+        reqs = deque()
         total = 0
         path = self.path
         zk = self.zk
@@ -71,10 +63,10 @@ class Usage(object):
         if stat is None:
             return 0
 
-        reqs.put(dispatch(path))
+        reqs.append(dispatch(path))
 
-        while pending:
-            req = reqs.get()
+        while reqs:
+            req = reqs.popleft()
 
             try:
                 children, stat = req.value
@@ -84,13 +76,9 @@ class Usage(object):
             if stat.dataLength > 0:
                 total += stat.dataLength
                 if ptotal:
-                    ptotal.add(stat.dataLength)
-
-            if stat.numChildren > 0:
-                pending += stat.numChildren
-                for child in children:
-                    reqs.put(dispatch(os.path.join(req.path, child)))
+                    ptotal.value = total
 
-            pending -= 1
+            for child in children:
+                reqs.append(dispatch(os.path.join(req.path, child)))
 
         return total
@@ -1,6 +1,7 @@
 """ helpers """
 
-from collections import namedtuple
+from collections import deque, namedtuple
+from threading import Thread
 
 try:
     from itertools import izip
@@ -12,6 +13,7 @@ import os
 import re
 import socket
 import sys
+import time
 
 
 PYTHON3 = sys.version_info > (3, )
@@ -56,6 +58,20 @@ def to_int(sint, default):
         return default
 
 
+def is_zlib(value):
+    """ does value start with a valid zlib (RFC 1950) header? """
+    if not isinstance(value, bytes) or len(value) < 2:
+        return False
+
+    cmf, flg = bytearray(value[:2])
+    return cmf & 0x0f == 8 and cmf >> 4 <= 7 and ((cmf << 8) | flg) % 31 == 0
+
+
+def is_lz4(value):
+    """ does value start with the LZ4 frame magic number? """
+    return isinstance(value, bytes) and value[:4] == b"\x04\x22\x4d\x18"
+
+
 def decoded(s):
     if PYTHON3:
         return str.encode(s).decode('unicode_escape')
@@ -73,16 +89,13 @@ class Netloc(namedtuple("Netloc", "host scheme credential")):
     """
     @classmethod
     def from_string(cls, netloc_string):
-        host = scheme = credential = ""
-        if not "@" in netloc_string:
-            host = netloc_string
-        else:
-            scheme_credential, host =  netloc_string.rsplit("@", 1)
+        scheme_credential, at, host = netloc_string.rpartition("@")
+        if not at:
+            return cls(host, "", "")
 
-            if ":" not in scheme_credential:
-                raise ValueError("Malformed scheme/credential (must be scheme:credential)")
-
-            scheme, credential = scheme_credential.split(":", 1)
+        scheme, colon, credential = scheme_credential.partition(":")
+        if not colon:
+            raise ValueError("Malformed scheme/credential (must be scheme:credential)")
 
         return cls(host, scheme, credential)
 
@@ -201,6 +214,42 @@ def get_ips(host, port):
     return ips
 
 
+_hostnames = {}
+
+
+def reverse_lookup(ip):
+    """
+    returns ip's hostname, or None if it has none. lookups are cached, since
+    the same (client & server) ips show up over and over
+    """
+    try:
+        return _hostnames[ip]
+    except KeyError:
+        pass
+
+    try:
+        hostname = socket.gethostbyaddr(ip)[0]
+    except socket.herror:
+        hostname = None
+
+    if len(_hostnames) >= 4096:
+        _hostnames.clear()
+    _hostnames[ip] = hostname
+
+    return hostname
+
+
+def reverse_lookups(ips, max_workers=32):
+    """ warms up reverse_lookup()'s cache for ips, doing up to max_workers lookups at once """
+    pending = [ip for ip in set(ips) if ip and ip not in _hostnames]
+    for start in range(0, len(pending), max_workers):
+        workers = [Thread(target=reverse_lookup, args=(ip,)) for ip in pending[start:start + max_workers]]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+
 def hosts_to_endpoints(hosts, port=2181):
     """
     return a list of (host, port) tuples from a given host[:port],... str
@@ -279,3 +328,98 @@ def grouper(iterable, n):
     """ Group iterable in chunks of n size """
     args = [iter(iterable)] * n
     return izip(*args)
+
+
+_clock = getattr(time, "perf_counter", time.time)
+
+
+def precise_sleep(secs, spin_under=0.002):
+    """
+    like time.sleep(), but pauses shorter than spin_under secs are busy-waited:
+    the sleep syscall's overhead and timer slack are in the same order as the pause
+    """
+    if secs >= spin_under:
+        time.sleep(secs)
+        return
+
+    deadline = _clock() + secs
+    while _clock() < deadline:
+        pass
+
+
+def pipelined(items, dispatch, window=64):
+    """
+    calls dispatch(item) for each item, keeping at most window requests in
+    flight, and yields (item, result) in the same order as items. result is
+    whatever dispatch returned (i.e.: an IAsyncResult from a *_async call).
+    """
+    inflight = deque()
+    for item in items:
+        inflight.append((item, dispatch(item)))
+        if len(inflight) >= window:
+            yield inflight.popleft()
+
+    while inflight:
+        yield inflight.popleft()
+
+
+_regex_meta = re.compile(r"[.*+?\[\](){}|\\^$]")
+
+
+def text_matcher(content, flags):
+    """
+    returns a function that tells if a text contains content. like line_matcher(),
+    plain strings are matched with substring checks instead of the regex engine.
+    so are alternations of plain strings (i.e.: foo|bar), as a few substring checks.
+    raises sre_constants.error for bad patterns.
+    """
+    if _regex_meta.search(content.replace("|", "")) is None:
+        if flags & re.IGNORECASE:
+            needles = content.lower().split("|")
+            lower = True
+        else:
+            needles = content.split("|")
+            lower = False
+
+        if len(needles) == 1:
+            needle = needles[0]
+            if lower:
+                return lambda text: needle in text.lower()
+            return lambda text: needle in text
+
+        def matcher(text):
+            if lower:
+                text = text.lower()
+            return any(needle in text for needle in needles)
+
+        return matcher
+
+    return re.compile(content, flags).search
+
+
+def line_matcher(content, flags):
+    """
+    returns a function that takes a value and returns its lines matching content.
+    plain strings are matched with substring checks, the regex engine is only used
+    for actual patterns. raises sre_constants.error for bad patterns.
+    """
+    if _regex_meta.search(content) is None and "\n" not in content:
+        if flags & re.IGNORECASE:
+            needle = content.lower()
+
+            def matcher(value):
+                if needle not in value.lower():
+                    return []
+                return [line for line in value.split("\n") if needle in line.lower()]
+        else:
+            def matcher(value):
+                if content not in value:
+                    return []
+                return [line for line in value.split("\n") if content in line]
+    else:
+        regex = re.compile(content, flags)
+
+        def matcher(value):
+            return [line for line in value.split("\n") if regex.search(line)]
+
+    return matcher
@@ -1,7 +1,9 @@
 """
 a decorated KazooClient with handy operations on a ZK datatree and its znodes
 """
+from collections import defaultdict
 from contextlib import contextmanager
+from threading import Thread
 import os
 import re
 import socket
@@ -15,7 +17,27 @@ from kazoo.protocol.states import KazooState
 from .statmap import StatMap
 from .tree import Tree
 from .usage import Usage
-from .util import get_ips, hosts_to_endpoints, to_bytes
+from .util import (
+    get_ips,
+    hosts_to_endpoints,
+    line_matcher,
+    pipelined,
+    reverse_lookup,
+    split,
+    text_matcher,
+    to_bytes
+)
+
+
+def decoded_value(value):
+    """ utf-8 decode a znode's value, if possible """
+    try:
+        if value is not None:
+            value = value.decode(encoding="utf-8")
+    except UnicodeDecodeError:
+        pass
+
+    return value
 
 
 @contextmanager
@@ -70,11 +92,9 @@ class ClientInfo(object):
             self.resolve_ip("server_hostname", self.server_ip)
 
     def resolve_ip(self, attr, ip):
-        try:
-            hname = socket.gethostbyaddr(ip)[0]
+        hname = reverse_lookup(ip)
+        if hname is not None:
             setattr(self, attr, hname)
-        except socket.herror:
-            pass
 
 
 class XTransactionRequest(TransactionRequest):
@@ -150,14 +170,15 @@ class XClient():
     def get(self, *args, **kwargs):
         """ wraps the default get() and deals with encoding """
         value, stat = self._zk.get(*args, **kwargs)
+        return (decoded_value(value), stat)
 
-        try:
-            if value is not None:
-                value = value.decode(encoding="utf-8")
-        except UnicodeDecodeError:
-            pass
-
-        return (value, stat)
+    def get_many(self, paths, window=64):
+        """ like get() for each path, but with a window of requests in flight.
+            yields (path, value, stat) in the same order as paths.
+        """
+        for path, result in pipelined(paths, self._zk.get_async, window):
+            value, stat = result.get()
+            yield path, decoded_value(value), stat
 
     def get_bytes(self, *args, **kwargs):
         """ no string decoding performed """
@@ -182,6 +203,32 @@ class XClient():
         """ use XTransactionRequest which is encoding aware (Py3k) """
         return XTransactionRequest(self)
 
+    def delete_recursive(self, path, batch_size=64):
+        """
+        like delete(path, recursive=True), but the subtree is found with an async walk
+        and deleted (deepest znodes first) in transactions of up to batch_size ops
+        """
+        # Tree yields parents before their children, so reversed it's a safe delete order
+        paths = list(Tree(self, path).get())
+        paths.reverse()
+        paths.append(path)
+
+        for start in range(0, len(paths), batch_size):
+            batch = paths[start:start + batch_size]
+            txn = self.transaction()
+            for bpath in batch:
+                txn.delete(bpath)
+
+            results = txn.commit()
+            if any(isinstance(result, Exception) for result in results):
+                # the subtree changed underneath us (znodes added or removed),
+                # so the whole batch was rolled back. redo it the slow way.
+                for bpath in batch:
+                    try:
+                        self._zk.delete(bpath, recursive=True)
+                    except NoNodeError:
+                        pass
+
     def du(self, path):
         """ returns the bytes used under path """
         return Usage(self, path).value
@@ -198,9 +245,11 @@ class XClient():
         if depth == -1:
             return
 
-        for tpath, _ in self.tree(path, depth, full_path=True):
+        # keep a window of get_acls() requests in flight while walking the tree
+        paths = (tpath for tpath, _ in self.tree(path, depth, full_path=True))
+        for tpath, result in pipelined(paths, self.get_acls_async):
             try:
-                acls, stat = self.get_acls(tpath)
+                acls, stat = result.get()
             except NoNodeError:
                 continue
 
@@ -212,20 +261,20 @@ class XClient():
     def find(self, path, match, flags):
         """ find every matching child path under path """
         try:
-            match = re.compile(match, flags)
+            match = text_matcher(match, flags)
         except sre_constants.error as ex:
             print("Bad regexp: %s" % (ex))
             return
 
         offset = len(path)
         for cpath in Tree(self, path).get():
-            if match.search(cpath[offset:]):
+            if match(cpath[offset:]):
                 yield cpath
 
     def grep(self, path, content, flags):
         """ grep every child path under path for content """
         try:
-            match = re.compile(content, flags)
+            match = line_matcher(content, flags)
         except sre_constants.error as ex:
             print("Bad regexp: %s" % (ex))
             return
@@ -234,7 +283,7 @@ class XClient():
             yield (gpath, matches)
 
     def do_grep(self, path, match):
-        """ grep's work horse """
+        """ grep's work horse, match is a function as returned by line_matcher() """
         try:
             children = self.get_children(path)
         except (NoNodeError, NoAuthError):
@@ -250,7 +299,7 @@ class XClient():
             if value is not None:
                 if isinstance(value, bytes):
                     value = value.decode(errors='ignore')
-                matches = [line for line in value.split("\n") if match.search(line)]
+                matches = match(value)
                 if len(matches) > 0:
                     yield (full_path, matches)
 
@@ -272,6 +321,40 @@ class XClient():
                 count += stat.numChildren
         return count
 
+    def child_counts(self, path, max_depth):
+        """
+        yields (child, count) for each child in tree(path, max_depth, full_path=True),
+        where count is what child_count(child) would return. unlike calling child_count()
+        per child, the subtree under path is only fetched once (and asynchronously).
+        the listing itself is also walked from what was fetched, not with tree().
+        """
+        counts = defaultdict(int)
+        children = defaultdict(list)
+        offset = len(path)
+
+        # credit each znode's children to the znode itself and to all its ancestors
+        for cpath, stat in self.stat_map(path, recursive=True):
+            parent, _ = split(cpath)
+            children[parent].append(cpath)
+            num = stat.numChildren
+            while num > 0 and len(cpath) > offset:
+                counts[cpath] += num
+                cpath, _ = split(cpath)
+
+        # same (DFS) order as tree(): siblings come out of stat_map() in get_children() order
+        stack = [(0, iter(children[path]))]
+        while stack:
+            level, kids = stack[-1]
+            cpath = next(kids, None)
+            if cpath is None:
+                stack.pop()
+                continue
+
+            yield cpath, counts[cpath]
+
+            if max_depth == 0 or level + 1 < max_depth:
+                stack.append((level + 1, iter(children[cpath])))
+
     def tree(self, path, max_depth, full_path=False, include_stat=False):
         """DFS generator which starts from a given path and goes up to a max depth.
 
@@ -283,33 +366,56 @@ class XClient():
         for child_level_stat in self.do_tree(path, max_depth, 0, full_path, include_stat):
             yield child_level_stat
 
-    def do_tree(self, path, max_depth, level, full_path, include_stat):
-        """ tree's work horse """
+    def do_tree(self, path, max_depth, level, full_path, include_stat, window=64):
+        """
+        tree's work horse. it keeps an explicit stack of children iterators, so
+        deep paths aren't passed up through one generator per level. the children
+        of upcoming siblings are fetched ahead (up to window requests per level),
+        so the walk isn't one get_children() round trip after another.
+        """
+        def names_of(result):
+            try:
+                return result.get()
+            except (NoNodeError, NoAuthError):
+                return []
+
+        def children_of(path, level, names):
+            """ yields (name, IAsyncResult for its children or None if not recursing) """
+            if max_depth == 0 or level + 1 < max_depth:
+                return pipelined(names, lambda name: self.get_children_async(os.path.join(path, name)), window)
+            return ((name, None) for name in names)
+
         try:
-            children = self.get_children(path)
+            names = self.get_children(path)
         except (NoNodeError, NoAuthError):
-            children = []
+            names = []
+
+        stack = [(path, level, children_of(path, level, names))]
+        while stack:
+            path, level, children = stack[-1]
+            entry = next(children, None)
+            if entry is None:
+                stack.pop()
+                continue
 
-        for child in children:
-            cpath = os.path.join(path, child) if full_path else child
+            child, result = entry
+            cpath = os.path.join(path, child)
             if include_stat:
-                yield cpath, level, self.stat(os.path.join(path, child))
+                yield cpath if full_path else child, level, self.stat(cpath)
             else:
-                yield cpath, level
+                yield cpath if full_path else child, level
 
-            if max_depth == 0 or level + 1 < max_depth:
-                cpath = os.path.join(path, child)
-                for rchild_rlevel_rstat in self.do_tree(cpath, max_depth, level + 1, full_path, include_stat):
-                    yield rchild_rlevel_rstat
+            if result is not None:
+                stack.append((cpath, level + 1, children_of(cpath, level + 1, names_of(result))))
 
     def fast_tree(self, path, exclude_recurse=None):
         """ a fast async version of tree() """
         for cpath in Tree(self, path).get(exclude_recurse):
             yield cpath
 
-    def stat_map(self, path):
+    def stat_map(self, path, recursive=False):
         """ a generator for <child, Stat> """
-        return StatMap(self, path).get()
+        return StatMap(self, path, recursive).get()
 
     def diff(self, path_a, path_b):
         """ Performs a deep comparison of path_a/ and path_b/
@@ -473,14 +579,34 @@ class XClient():
 
         """
         dump_by_endpoint = {}
+        errors = {}
 
-        for endpoint in self._to_endpoints(hosts):
+        def fetch(endpoint):
             try:
                 out = self.cmd([endpoint], "dump")
             except self.CmdFailed as ex:
                 out = ""
+            except Exception as ex:
+                # a thread would just swallow it, so hand it back to the caller
+                errors[endpoint] = ex
+                return
             dump_by_endpoint[endpoint] = out
 
+        # ask every server at once, so this takes as long as the slowest one
+        endpoints = self._to_endpoints(hosts)
+        workers = []
+        for endpoint in endpoints:
+            worker = Thread(target=fetch, args=(endpoint,))
+            worker.start()
+            workers.append(worker)
+
+        for worker in workers:
+            worker.join()
+
+        for endpoint in endpoints:
+            if endpoint in errors:
+                raise errors[endpoint]
+
         return dump_by_endpoint
 
     def ephemerals_info(self, hosts):